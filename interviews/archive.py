@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import DateTimeField
+from django.utils import timezone
+
+from .models import (
+    ArchivedComment,
+    ArchivedFavoriteInterview,
+    ArchivedInterview,
+    Comment,
+    FavoriteInterview,
+    Interview,
+)
+
+# 冷熱資料分離
+# 超過 ARCHIVE_AFTER_DAYS 的面試連同留言、收藏一批一批搬到封存表
+# 常用的 Interview、Comment 表和索引保持小小的，比較容易整個放在記憶體裡
+
+
+def cutoff(days=None):
+    days = settings.ARCHIVE_AFTER_DAYS if days is None else days
+    moment = timezone.now() - timedelta(days=days)
+
+    # interview_date 是 DateField，要用日期比較
+    field = Interview._meta.get_field(settings.ARCHIVE_DATE_FIELD)
+    return moment if isinstance(field, DateTimeField) else moment.date()
+
+
+def _copy(obj, model, **extra):
+    # 只複製兩邊都有的欄位，id 也一起保留
+    names = {field.attname for field in model._meta.concrete_fields}
+    values = {field.attname: getattr(obj, field.attname) for field in obj._meta.concrete_fields if field.attname in names}
+    return model(**values, **extra)
+
+
+def archive_batch(before, batch_size):
+    with transaction.atomic():
+        interviews = list(
+            Interview.objects.select_for_update()
+            .filter(**{f"{settings.ARCHIVE_DATE_FIELD}__lt": before})
+            .order_by("id")[:batch_size]
+        )
+        if not interviews:
+            return 0
+
+        ids = [interview.id for interview in interviews]
+        ArchivedInterview.objects.bulk_create([_copy(interview, ArchivedInterview) for interview in interviews])
+        ArchivedComment.objects.bulk_create(
+            [_copy(comment, ArchivedComment) for comment in Comment.objects.filter(interview_id__in=ids).iterator()],
+            batch_size=batch_size,
+        )
+        ArchivedFavoriteInterview.objects.bulk_create(
+            [
+                ArchivedFavoriteInterview(user_id=favorite.user_id, interview_id=favorite.interview_id)
+                for favorite in FavoriteInterview.objects.filter(interview_id__in=ids).iterator()
+            ],
+            batch_size=batch_size,
+        )
+
+        # 留言、收藏、相似面試會跟著 CASCADE 刪掉
+        # 把這些面試列為鄰居的會在 pre_delete 標記成要重算 (見 signals.py)
+        Interview.objects.filter(id__in=ids).delete()
+
+    return len(ids)
+
+
+def archive(before=None, batch_size=None):
+    before = cutoff() if before is None else before
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+
+    total = 0
+    while count := archive_batch(before, batch_size):
+        total += count
+    return total
+
+
+# Postgres 的 range partition
+# 只用在封存表：partition table 的主鍵一定要包含 partition key，
+# 常用表用的是一般的 id 主鍵，所以不改。封存表改用一般索引查 id
+PARTITIONS = [
+    (ArchivedInterview, "interview_date", ["id", "user_id"]),
+    (ArchivedComment, "created_at", ["id", "interview_id", "user_id"]),
+]
+
+
+def partition_sql(first_year, last_year):
+    statements = []
+    for model, key, indexes in PARTITIONS:
+        table = model._meta.db_table
+        statements += [
+            f"ALTER TABLE {table} RENAME TO {table}_unpartitioned",
+            f"CREATE TABLE {table} (LIKE {table}_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE ({key})",
+        ]
+        statements += [
+            f"CREATE TABLE {table}_{year} PARTITION OF {table} FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+            for year in range(first_year, last_year + 1)
+        ]
+        # 範圍外和 interview_date 是 NULL 的都放在 default partition
+        statements.append(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        statements += [f"CREATE INDEX {table}_{column}_idx ON {table} ({column})" for column in indexes]
+        statements += [
+            f"INSERT INTO {table} SELECT * FROM {table}_unpartitioned",
+            f"DROP TABLE {table}_unpartitioned",
+        ]
+    return statements
+
+
+def partition(first_year, last_year):
+    if connection.vendor != "postgresql":
+        raise NotImplementedError("Partitioning is only supported on PostgreSQL")
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass",
+            [ArchivedInterview._meta.db_table],
+        )
+        if cursor.fetchone():
+            raise ValueError("Archive tables are already partitioned")
+
+        for statement in partition_sql(first_year, last_year):
+            cursor.execute(statement)
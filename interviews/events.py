@@ -0,0 +1,143 @@
+import asyncio
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# 推播給 SSE 連線的事件中心
+# local: 同一個 process 內用 asyncio.Queue 分送，適合單一 worker
+# postgres: 透過 LISTEN/NOTIFY 讓多個 worker 都收得到事件
+
+# Postgres NOTIFY 的 payload 上限是 8000 bytes，留一點空間
+NOTIFY_PAYLOAD_LIMIT = 7900
+# 每條連線最多暫存的事件數，client 太慢就丟掉，避免記憶體無限成長
+QUEUE_SIZE = 100
+
+
+def format_event(event, data=""):
+    # SSE 格式：多行資料每一行都要加 "data: "
+    lines = [f"event: {event}"]
+    lines += [f"data: {line}" for line in str(data).splitlines() or [""]]
+    return "\n".join(lines) + "\n\n"
+
+
+def _offer(queue, message):
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        pass
+
+
+class LocalBroker:
+    def __init__(self):
+        # interview_id => {(loop, queue), ...}
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def publish(self, interview_id, event, data=""):
+        self._dispatch(interview_id, event, data)
+
+    def _dispatch(self, interview_id, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(interview_id, ()))
+
+        # publish 可能在 sync view 的 thread 被呼叫，要交回各自的 event loop 處理
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(_offer, queue, (event, data))
+
+    async def subscribe(self, interview_id, keepalive=None):
+        # 超過 keepalive 秒沒有事件時 yield None，讓呼叫端送心跳
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        subscriber = (loop, queue)
+
+        with self._lock:
+            self._subscribers.setdefault(interview_id, set()).add(subscriber)
+
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(interview_id)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del self._subscribers[interview_id]
+
+
+class PostgresBroker(LocalBroker):
+    channel = "interview_events"
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+
+    def publish(self, interview_id, event, data=""):
+        payload = json.dumps({"interview_id": interview_id, "event": event, "data": data})
+
+        # 太大的事件送不進 NOTIFY，改通知 client 重新整理
+        if len(payload.encode()) > NOTIFY_PAYLOAD_LIMIT:
+            payload = json.dumps({"interview_id": interview_id, "event": "reload", "data": ""})
+
+        # NOTIFY 會等 transaction commit 之後才送出
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    async def subscribe(self, interview_id, keepalive=None):
+        # 每個 process 只開一條 LISTEN 連線，再分送給本地的訂閱者
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+        subscription = super().subscribe(interview_id, keepalive)
+        try:
+            async for message in subscription:
+                yield message
+        finally:
+            await subscription.aclose()
+
+    async def _listen(self):
+        import psycopg
+        from psycopg.conninfo import make_conninfo
+
+        db = settings.DATABASES["default"]
+        conninfo = make_conninfo(
+            dbname=db.get("NAME"),
+            user=db.get("USER") or None,
+            password=db.get("PASSWORD") or None,
+            host=db.get("HOST") or None,
+            port=db.get("PORT") or None,
+        )
+
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(conninfo, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {self.channel}")
+                    async for notify in conn.notifies():
+                        message = json.loads(notify.payload)
+                        self._dispatch(message["interview_id"], message["event"], message["data"])
+            except Exception:
+                logger.exception("interview events listener disconnected, retrying")
+                await asyncio.sleep(1)
+
+
+BACKENDS = {
+    "local": LocalBroker,
+    "postgres": PostgresBroker,
+}
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = BACKENDS[settings.INTERVIEW_EVENTS_BACKEND]()
+    return _broker
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from interviews import archive
+
+
+class Command(BaseCommand):
+    help = "把太舊的面試連同留言、收藏分批搬到封存表"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help=f"超過幾天就封存，預設 ARCHIVE_AFTER_DAYS ({settings.ARCHIVE_AFTER_DAYS})")
+        parser.add_argument("--batch-size", type=int, default=None, help="每批搬幾篇面試")
+        parser.add_argument("--partition", nargs=2, type=int, metavar=("FIRST_YEAR", "LAST_YEAR"),
+                            help="(PostgreSQL) 把封存表改成依年份 range partition，只需要執行一次")
+        parser.add_argument("--sql", action="store_true", help="搭配 --partition，只印出 SQL 不執行")
+
+    def handle(self, *args, **options):
+        if options["partition"]:
+            first_year, last_year = options["partition"]
+            if options["sql"]:
+                for statement in archive.partition_sql(first_year, last_year):
+                    self.stdout.write(f"{statement};")
+                return
+
+            try:
+                archive.partition(first_year, last_year)
+            except (NotImplementedError, ValueError) as e:
+                raise CommandError(e)
+            self.stdout.write(self.style.SUCCESS(f"封存表已依 {first_year} ~ {last_year} 年分割"))
+            return
+
+        before = archive.cutoff(options["days"])
+        count = archive.archive(before, options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"已封存 {count} 篇 {settings.ARCHIVE_DATE_FIELD} 早於 {before} 的面試"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from interviews import recommendations
+
+
+class Command(BaseCommand):
+    help = "計算每篇面試的相似面試，預設只更新新增或編輯過的面試"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="全部重新計算 (包含 IDF)")
+        parser.add_argument("-k", type=int, default=None, help="每篇面試保留幾個相似面試")
+
+    def handle(self, *args, **options):
+        if options["full"]:
+            count = recommendations.rebuild(k=options["k"])
+        else:
+            count = recommendations.update(k=options["k"])
+
+        self.stdout.write(self.style.SUCCESS(f"已更新 {count} 篇面試的相似面試"))
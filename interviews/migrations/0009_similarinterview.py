@@ -0,0 +1,33 @@
+# Generated by Django 6.1.2 on 2026-10-19 16:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0008_alter_interview_favorited_by'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interview',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='SimilarInterview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('interview', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_set', to='interviews.interview')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='interviews.interview')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('interview', 'rank'), name='unique_similar_interview_rank')],
+            },
+        ),
+    ]
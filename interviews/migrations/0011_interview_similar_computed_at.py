@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-19 16:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0010_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interview',
+            name='similar_computed_at',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
@@ -11,6 +11,8 @@ class Interview(models.Model):
     )
     result = models.CharField(max_length=100, null=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True, null=True) # 推薦用，判斷哪些面試需要重算
+    similar_computed_at = models.DateTimeField(null=True) # 上次計算相似面試的時間，NULL 代表需要重算
     favorited_by = models.ManyToManyField(
         User,
         through="FavoriteInterview",
@@ -34,4 +36,43 @@ class Comment(models.Model):
 # join table
 class FavoriteInterview(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    interview = models.ForeignKey(Interview, on_delete=models.CASCADE)
\ No newline at end of file
+    interview = models.ForeignKey(Interview, on_delete=models.CASCADE)
+
+# 相似面試的鄰居表，由 build_similar_interviews 批次計算
+# show 頁面只要用 interview_id 查一次索引就拿得到
+class SimilarInterview(models.Model):
+    interview = models.ForeignKey(Interview, on_delete=models.CASCADE, related_name="similar_set")
+    similar = models.ForeignKey(Interview, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["interview", "rank"], name="unique_similar_interview_rank"),
+        ]
+
+# 封存表：太舊的面試連同留言、收藏搬到這裡 (見 interviews/archive.py)
+# 保留原本的 id，show 找不到面試時會到這裡找
+# 關聯不建立資料庫 constraint，才能改成 Postgres 的 partition table
+class ArchivedInterview(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    company_name = models.CharField(max_length=100)
+    position = models.CharField(max_length=50)
+    interview_date = models.DateField(null=True)
+    review = models.TextField()
+    rating = models.PositiveSmallIntegerField()
+    result = models.CharField(max_length=100, null=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+", db_constraint=False)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+class ArchivedComment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    interview = models.ForeignKey(ArchivedInterview, on_delete=models.CASCADE, related_name="comments", db_constraint=False)
+    content = models.TextField()
+    created_at = models.DateTimeField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+", db_constraint=False)
+
+class ArchivedFavoriteInterview(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+", db_constraint=False)
+    interview = models.ForeignKey(ArchivedInterview, on_delete=models.CASCADE, related_name="favorites", db_constraint=False)
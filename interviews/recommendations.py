@@ -0,0 +1,148 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Interview, SimilarInterview
+
+# 「相似面試」推薦
+# 用 review、position、company_name 建 TF-IDF 向量，算 cosine similarity 取前 k 名
+# 向量是 {term: weight} 的稀疏表示，再用倒排索引 (term => [(interview_id, weight), ...])
+# 只跟有共同 term 的面試做內積，不用兩兩比對
+
+# 公司名稱和職位比心得更能代表一篇面試，給比較高的權重
+FIELD_WEIGHTS = {"company_name": 3, "position": 2, "review": 1}
+FIELDS = list(FIELD_WEIGHTS)
+
+LATIN = re.compile(r"[a-z0-9]+")
+CJK = re.compile(r"[\u3400-\u9fff]+")
+
+
+def tokenize(text):
+    # 英文用單字，中文沒有空白分詞，改用相鄰兩個字 (bigram)
+    text = (text or "").lower()
+    tokens = LATIN.findall(text)
+    for run in CJK.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens += [run[i:i + 2] for i in range(len(run) - 1)]
+    return tokens
+
+
+def term_counts(interview):
+    counts = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(interview[field]):
+            counts[token] += weight
+    return counts
+
+
+class Index:
+    def __init__(self, rows):
+        # rows: [{"id": ..., "company_name": ..., "position": ..., "review": ...}, ...]
+        counts = {row["id"]: term_counts(row) for row in rows}
+
+        document_frequency = Counter()
+        for terms in counts.values():
+            document_frequency.update(terms.keys())
+
+        total = len(counts)
+        idf = {term: math.log((1 + total) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+        self.vectors = {}
+        self.postings = defaultdict(list)
+        for interview_id, terms in counts.items():
+            vector = {term: (1 + math.log(count)) * idf[term] for term, count in terms.items()}
+            norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1
+            vector = {term: weight / norm for term, weight in vector.items()}
+
+            self.vectors[interview_id] = vector
+            for term, weight in vector.items():
+                self.postings[term].append((interview_id, weight))
+
+    def similarities(self, interview_id):
+        scores = defaultdict(float)
+        for term, weight in self.vectors[interview_id].items():
+            for other_id, other_weight in self.postings[term]:
+                scores[other_id] += weight * other_weight
+        scores.pop(interview_id, None)
+        return scores
+
+    def neighbours(self, interview_id, k):
+        scores = self.similarities(interview_id)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+def load_index():
+    return Index(Interview.objects.values("id", *FIELDS).iterator(chunk_size=2000))
+
+
+def save_neighbours(index, interview_ids, k, batch_size=1000):
+    rows = []
+    for interview_id in interview_ids:
+        rows += [
+            SimilarInterview(interview_id=interview_id, similar_id=similar_id, score=score, rank=rank)
+            for rank, (similar_id, score) in enumerate(index.neighbours(interview_id, k))
+        ]
+
+    with transaction.atomic():
+        SimilarInterview.objects.filter(interview_id__in=interview_ids).delete()
+        SimilarInterview.objects.bulk_create(rows, batch_size=batch_size)
+        # 找不到相似面試的也要記錄算過了，不然每次 update() 都會被當成有變動
+        # queryset.update() 不會動到 updated_at
+        Interview.objects.filter(id__in=interview_ids).update(similar_computed_at=timezone.now())
+
+
+def stale_interview_ids():
+    # 新面試還沒算過，或是算完之後面試又被編輯過
+    return list(
+        Interview.objects.filter(
+            Q(similar_computed_at__isnull=True) | Q(updated_at__gt=F("similar_computed_at"))
+        ).values_list("id", flat=True)
+    )
+
+
+def rebuild(k=None, batch_size=500):
+    k = k or settings.SIMILAR_INTERVIEWS_K
+    index = load_index()
+    interview_ids = list(index.vectors)
+
+    for start in range(0, len(interview_ids), batch_size):
+        save_neighbours(index, interview_ids[start:start + batch_size], k)
+
+    return len(interview_ids)
+
+
+def update(k=None):
+    # 增量更新：重算有變動的面試，以及可能因此改變排名的其他面試
+    # 其他面試的分數不會因為 IDF 改變而重算，建議定期跑一次 rebuild
+    k = k or settings.SIMILAR_INTERVIEWS_K
+    stale = set(stale_interview_ids())
+    if not stale:
+        return 0
+
+    index = load_index()
+    stale &= index.vectors.keys()
+
+    # 原本就把這些面試列為鄰居的，分數已經過期
+    affected = set(
+        SimilarInterview.objects.filter(similar_id__in=stale).values_list("interview_id", flat=True)
+    )
+
+    # 新分數擠進其他面試前 k 名的
+    lowest = dict(
+        SimilarInterview.objects.filter(rank=k - 1).values_list("interview_id", "score")
+    )
+    for interview_id in stale:
+        for other_id, score in index.similarities(interview_id).items():
+            if score > lowest.get(other_id, 0):
+                affected.add(other_id)
+
+    interview_ids = list((stale | affected) & index.vectors.keys())
+    save_neighbours(index, interview_ids, k)
+    return len(interview_ids)
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from my_project.cache import invalidate
+from .models import Interview, SimilarInterview
+
+# 面試有異動時，清掉匿名訪客的面試列表快取
+@receiver(post_save, sender=Interview)
+@receiver(post_delete, sender=Interview)
+def invalidate_interview_pages(sender, **kwargs):
+    invalidate("interviews")
+
+# 面試被刪除 (或封存) 時，把它列為鄰居的相似面試會跟著 CASCADE 刪掉
+# 列表會變短，標記成下次 recommendations.update() 要重算
+@receiver(pre_delete, sender=Interview)
+def mark_neighbours_stale(sender, instance, **kwargs):
+    Interview.objects.filter(
+        id__in=SimilarInterview.objects.filter(similar=instance).values("interview_id")
+    ).exclude(id=instance.id).update(similar_computed_at=None)
@@ -1,3 +1,123 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from .models import (
+    ArchivedFavoriteInterview,
+    ArchivedInterview,
+    Comment,
+    FavoriteInterview,
+    Interview,
+    SimilarInterview,
+)
+from .recommendations import rebuild, update
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("user", password="password")
+        self.client.force_login(self.user)
+
+    def create_interview(self, interview_date, **kwargs):
+        return Interview.objects.create(
+            company_name="公司",
+            position="工程師",
+            review="心得",
+            rating=5,
+            user=self.user,
+            interview_date=interview_date,
+            **kwargs,
+        )
+
+    def archive(self, days=30):
+        call_command("archive_interviews", "--days", str(days), stdout=StringIO())
+
+    def test_moves_comments_and_favorites_with_ids(self):
+        interview = self.create_interview(date(2010, 1, 1))
+        comment = interview.comment_set.create(content="留言", user=self.user)
+        self.user.favorite_interviews.add(interview)
+
+        self.archive()
+
+        archived = ArchivedInterview.objects.get(pk=interview.id)
+        self.assertEqual(archived.company_name, "公司")
+        self.assertEqual(archived.comments.get().id, comment.id)
+        self.assertEqual(archived.comments.get().content, "留言")
+        self.assertTrue(ArchivedFavoriteInterview.objects.filter(interview_id=interview.id, user=self.user).exists())
+
+        self.assertFalse(Interview.objects.filter(pk=interview.id).exists())
+        self.assertFalse(Comment.objects.filter(pk=comment.id).exists())
+        self.assertFalse(FavoriteInterview.objects.filter(interview_id=interview.id).exists())
+
+    def test_days_cutoff_on_interview_date(self):
+        today = date.today()
+        recent = self.create_interview(today - timedelta(days=10))
+        old = self.create_interview(today - timedelta(days=40))
+        undated = self.create_interview(None)
+
+        self.archive(days=30)
+
+        self.assertEqual(list(ArchivedInterview.objects.values_list("id", flat=True)), [old.id])
+        self.assertEqual(
+            set(Interview.objects.values_list("id", flat=True)),
+            {recent.id, undated.id},
+        )
+
+    def test_show_falls_back_to_archive(self):
+        interview = self.create_interview(date(2010, 1, 1))
+        interview.comment_set.create(content="封存的留言", user=self.user)
+        self.archive()
+
+        response = self.client.get(f"/interviews/{interview.id}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "interviews/archived.html")
+        self.assertContains(response, "封存的留言")
+
+    def test_post_to_archived_interview_returns_404(self):
+        interview = self.create_interview(date(2010, 1, 1))
+        self.archive()
+
+        response = self.client.post(f"/interviews/{interview.id}", {"company_name": "新公司"})
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(ArchivedInterview.objects.get(pk=interview.id).company_name, "公司")
+
+    def test_marks_neighbours_of_archived_interviews_stale(self):
+        old = self.create_interview(date(2010, 1, 1))
+        other = self.create_interview(date.today())
+        call_command("build_similar_interviews", stdout=StringIO())
+        self.assertTrue(SimilarInterview.objects.filter(interview=other, similar_id=old.id).exists())
+
+        self.archive()
+
+        other.refresh_from_db()
+        self.assertIsNone(other.similar_computed_at)
+
+
+class SimilarInterviewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("user", password="password")
+        self.client.force_login(self.user)
+
+    def create_interview(self, review):
+        return Interview.objects.create(
+            company_name="公司", position="工程師", review=review, rating=5, user=self.user
+        )
+
+    def test_deleting_a_neighbour_refills_the_list(self):
+        interviews = [self.create_interview(f"後端 面試 題目 {n}") for n in range(5)]
+        rebuild(k=3)
+        first = interviews[0]
+        deleted = first.similar_set.get(rank=0).similar
+
+        self.client.get(f"/interviews/{deleted.id}/delete")
+
+        first.refresh_from_db()
+        self.assertIsNone(first.similar_computed_at)
+        update(k=3)
+        self.assertEqual(first.similar_set.count(), 3)
+        self.assertNotIn(deleted.id, first.similar_set.values_list("similar_id", flat=True))
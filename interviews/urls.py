@@ -11,4 +11,5 @@ urlpatterns = [
     path("<int:id>/delete", views.delete, name="delete"),
     path("<int:id>/comment", views.comment, name="comment"),
     path("<int:id>/favorite", views.favorite, name="favorite"),
+    path("<int:id>/events", views.events, name="events"), # SSE，即時推播留言與收藏數
 ]
\ No newline at end of file
@@ -1,11 +1,22 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Interview
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.template.loader import render_to_string
+from django.db import transaction
+from .models import Interview, ArchivedInterview
 from .forms import InterviewForm
+from .events import get_broker, format_event
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_POST, require_GET
 from django.contrib import messages
+from my_project.cache import anonymous_cache_page
+from my_project.streaming import render_stream
+
+# SSE 沒有事件時定期送心跳，避免 proxy 把閒置連線切掉
+EVENTS_KEEPALIVE = 15
 
 # Create your views here.
+@anonymous_cache_page(group="interviews") # 只快取匿名訪客的 GET，新增/修改/刪除面試時會清掉
 def index(req):
 
     # 新增資料
@@ -49,7 +60,9 @@ def index(req):
         # 顯示所有面試記錄列表
         # 從資料庫中獲取所有面試記錄
         interviews = Interview.objects.order_by("-id") # 依 id 反向排序
-        return render(req, "interviews/index.html", {"interviews": interviews})
+
+        # 先送出頁首，列表再分批渲染、串流送出
+        return render_stream(req, "interviews/index.html", {}, "interviews/index_rows.html", interviews, "interviews")
 
 # 檢查是否有登入
 # @login_required(login_url="users:sign_in")
@@ -60,7 +73,13 @@ def new(req):
 
 @login_required
 def show(req, id): # 參數要多加 id，從 urls 傳來的關鍵字引數
-    interview = get_object_or_404(Interview, pk=id)
+    interview = Interview.objects.filter(pk=id).first()
+
+    # 找不到的話可能已經被封存，只能看不能改
+    if interview is None:
+        if req.POST:
+            raise Http404("Interview does not exist")
+        return archived(req, id)
 
     # 更新資料，因為 HTML 只支援 GET, POST 兩種方法，用 POST 來達到 PUT/PATCH 的效果
     if req.POST:
@@ -115,7 +134,19 @@ def show(req, id): # 參數要多加 id，從 urls 傳來的關鍵字引數
         
         # Interview 角度
         comments = interview.comment_set.prefetch_related("user").order_by("-created_at")
-        return render(req, "interviews/show.html", {"interview": interview, "comments": comments})
+
+        # 相似面試，事先由 build_similar_interviews 算好
+        similar_interviews = interview.similar_set.select_related("similar").order_by("rank")
+        context = {"interview": interview, "similar_interviews": similar_interviews}
+
+        # 留言可能很多，跟列表頁一樣用串流送出
+        return render_stream(req, "interviews/show.html", context, "interviews/comment_rows.html", comments, "comments")
+
+def archived(req, id):
+    interview = get_object_or_404(ArchivedInterview, pk=id)
+    comments = interview.comments.select_related("user").order_by("-created_at")
+    favorites = interview.favorites.count()
+    return render(req, "interviews/archived.html", {"interview": interview, "comments": comments, "favorites": favorites})
 
 @login_required
 def edit(req, id): # 參數要多加 id，從 urls 傳來的關鍵字引數
@@ -148,10 +179,14 @@ def comment(req, id):
     # interview.comment_set
     # comment_set 是虛擬的東西，不是真正的欄位，而是 QuerySet
     # 拿 interview 資料的所有留言，讓新增的時候不用寫 id，較方便
-    interview.comment_set.create(
+    comment = interview.comment_set.create(
         content = req.POST['content'],
         user=req.user
         )
+
+    # 推播新留言給正在看這篇面試的人
+    fragment = render_to_string("interviews/comment.html", {"comment": comment})
+    transaction.on_commit(lambda: get_broker().publish(interview.id, "comment", fragment))
     
     # Comment 角度
     # --------------------------------------
@@ -181,6 +216,10 @@ def favorite(req, id):
         # 如果沒有按過讚，則加上（add）
         favorites.add(interview)
 
+    # 推播最新的收藏數
+    count = interview.favorited_by.count()
+    transaction.on_commit(lambda: get_broker().publish(interview.id, "favorite", count))
+
     # # 以 Interview model 的角度處理 ManyToMany 關聯
     # # 判斷這篇文章是否已經被按過讚
     # if interview.favorited_by.filter(pk=user.pk).exists():
@@ -202,6 +241,30 @@ def favorite(req, id):
     return render(req, "interviews/favorite.html", {"user": req.user, "interview": interview})
     # return redirect("interviews:show", id=interview.id)
 
+@require_GET
+@login_required
+async def events(req, id):
+    # WSGI (例如 runserver) 會把無限的串流整個讀進記憶體，卡住這個 thread
+    # 回 204 讓 EventSource 不要再重連，頁面就只是沒有即時更新
+    if not isinstance(req, ASGIRequest):
+        return HttpResponse(status=204)
 
-    
-    
+    if not await Interview.objects.filter(pk=id).aexists():
+        raise Http404("Interview does not exist")
+
+    async def stream():
+        subscription = get_broker().subscribe(id, keepalive=EVENTS_KEEPALIVE)
+        try:
+            async for message in subscription:
+                if message is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield format_event(*message)
+        finally:
+            await subscription.aclose()
+
+    # 閒置連線只是一個等待中的 coroutine，需要用 ASGI server 執行
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
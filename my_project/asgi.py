@@ -5,12 +5,24 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+The live updates endpoint (``interviews:events``) streams Server-Sent Events
+from an async view, so it should be served through this application with an
+ASGI server such as uvicorn or daphne, e.g.::
+
+    uvicorn my_project.asgi:application
 """
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'my_project.settings')
 
 application = get_asgi_application()
+
+if settings.WARMUP_ON_STARTUP:
+    from my_project.warmup import warm_up
+
+    warm_up()
@@ -0,0 +1,109 @@
+from functools import wraps
+from hashlib import md5
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.http import HttpResponse
+
+# 匿名訪客的整頁快取
+# 沒登入、沒有 session、沒有 messages 的訪客看到的 HTML 都一樣，直接從快取回傳
+
+KEY_PREFIX = "pagecache"
+
+
+def _generation(group):
+    # 每個 group 有自己的版本號，invalidate() 時 +1，舊的快取就自然失效
+    return cache.get_or_set(f"{KEY_PREFIX}:{group}:generation", 1, None)
+
+
+def _cache_key(req, group):
+    path = md5(f"{req.get_host()}{req.get_full_path()}".encode()).hexdigest()
+    return f"{KEY_PREFIX}:{group}:{_generation(group)}:{path}"
+
+
+def _cacheable(req):
+    if req.method not in ("GET", "HEAD"):
+        return False
+
+    # 有 session (登入中) 或還有沒顯示的 messages，輸出會因人而異
+    if req.COOKIES.get(settings.SESSION_COOKIE_NAME):
+        return False
+    if req.COOKIES.get(CookieStorage.cookie_name):
+        return False
+
+    return True
+
+
+def _storable(req, response):
+    if response.status_code != 200:
+        return False
+
+    # 頁面用到了 CSRF token 或有設定 cookie，就不能給其他人共用
+    if req.META.get("CSRF_COOKIE_NEEDS_UPDATE") or response.cookies:
+        return False
+
+    return True
+
+
+def _store(key, response, timeout):
+    content_type = response["Content-Type"]
+
+    if not response.streaming:
+        cache.set(key, (response.content, content_type), timeout)
+        return
+
+    # 串流的頁面邊送邊收集，全部送完才存進快取，中途斷線就不存
+    chunks = []
+
+    if response.is_async:
+        async def tee(content):
+            async for chunk in content:
+                chunks.append(chunk)
+                yield chunk
+            cache.set(key, (b"".join(chunks), content_type), timeout)
+    else:
+        def tee(content):
+            for chunk in content:
+                chunks.append(chunk)
+                yield chunk
+            cache.set(key, (b"".join(chunks), content_type), timeout)
+
+    response.streaming_content = tee(response.streaming_content)
+
+
+def invalidate(group):
+    key = f"{KEY_PREFIX}:{group}:generation"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def anonymous_cache_page(group="pages", timeout=None):
+    if timeout is None:
+        timeout = settings.PAGE_CACHE_TIMEOUT
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(req, *args, **kwargs):
+            if not _cacheable(req):
+                return view(req, *args, **kwargs)
+
+            key = _cache_key(req, group)
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                response["X-Page-Cache"] = "hit"
+                return response
+
+            response = view(req, *args, **kwargs)
+            if _storable(req, response):
+                _store(key, response, timeout)
+                response["X-Page-Cache"] = "miss"
+            return response
+
+        return wrapper
+
+    return decorator
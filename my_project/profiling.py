@@ -0,0 +1,260 @@
+import cProfile
+import html
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+# 針對單一 request 的效能分析
+# PROFILING_ENABLED 沒開的話，Django 啟動時就把這個 middleware 拿掉，完全沒有額外成本
+#
+# 會被分析的 request：
+# - staff 帶上 X-Profile header
+# - 依 PROFILING_SAMPLE_RATE 抽樣，有設定 PROFILING_URL_NAMES 時只抽這些 url name
+#
+# sample 模式：另一個 thread 定時抓 view 的 call stack，輸出 collapsed stack 與 HTML flame graph
+# cprofile 模式：輸出 .prof 檔，可以用 pstats 或 snakeviz 打開
+#   Python 3.12 之後 cProfile 是用 sys.monitoring，整個 process 同時只能有一個，
+#   也會記到同時間其他 thread 的呼叫。已經有 request 在分析時就跳過，不會讓 request 失敗
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+MAX_DURATION = 300
+
+_cprofile_lock = threading.Lock()
+_cprofile_owner = None
+
+
+def _acquire_cprofile():
+    global _cprofile_owner
+    with _cprofile_lock:
+        # 串流的回應沒被讀完就不會釋放，超過 MAX_DURATION 就當作已經結束
+        if _cprofile_owner is not None and time.monotonic() - _cprofile_owner < MAX_DURATION:
+            return None
+        _cprofile_owner = time.monotonic()
+        return _cprofile_owner
+
+
+def _release_cprofile(owner):
+    global _cprofile_owner
+    with _cprofile_lock:
+        if _cprofile_owner == owner:
+            _cprofile_owner = None
+
+
+class Sampler:
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        # 串流的回應如果一直沒被讀取就不會呼叫 stop()，最多抓 MAX_DURATION 秒
+        deadline = time.monotonic() + MAX_DURATION
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+
+def _short_path(filename):
+    # 只留 site-packages 或專案底下的相對路徑，讓 flame graph 好讀一點
+    for root in (str(settings.BASE_DIR), *sys.path):
+        if root and filename.startswith(root):
+            return os.path.relpath(filename, root)
+    return filename
+
+
+def write_collapsed(stacks, path):
+    # Brendan Gregg 的 collapsed stack 格式，flamegraph.pl / speedscope 都吃
+    with open(path, "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def _build_tree(stacks):
+    root = {"name": "all", "value": 0, "children": {}}
+    for stack, count in stacks.items():
+        root["value"] += count
+        node = root
+        for name in stack.split(";"):
+            node = node["children"].setdefault(name, {"name": name, "value": 0, "children": {}})
+            node["value"] += count
+    return root
+
+
+def _render_node(node, total):
+    width = node["value"] / total * 100
+    label = html.escape(node["name"])
+    children = "".join(
+        _render_node(child, node["value"])
+        for child in sorted(node["children"].values(), key=lambda child: -child["value"])
+    )
+    return (
+        f'<div class="frame" style="width:{width:.3f}%">'
+        f'<div class="label" title="{label} ({node["value"]} samples)">{label}</div>'
+        f'<div class="children">{children}</div>'
+        f"</div>"
+    )
+
+
+def write_flamegraph(stacks, path, title):
+    # 不依賴外部工具的 HTML flame graph (由上往下的 icicle 圖)
+    tree = _build_tree(stacks)
+    body = _render_node(tree, tree["value"] or 1)
+    with open(path, "w") as f:
+        f.write(f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<title>{html.escape(title)}</title>
+<style>
+body {{ font: 12px monospace; margin: 1em; }}
+.frame {{ display: inline-block; vertical-align: top; box-sizing: border-box; }}
+.label {{ background: #f3a95b; border: 1px solid #fff; padding: 2px; overflow: hidden; white-space: nowrap; text-overflow: ellipsis; }}
+.label:hover {{ background: #e8803a; }}
+.children {{ display: flex; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(title)}</h1>
+<p>{tree["value"]} samples</p>
+{body}
+</body>
+</html>
+""")
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.output_dir = Path(settings.PROFILING_DIR)
+
+    def __call__(self, req):
+        return self.get_response(req)
+
+    def should_profile(self, req):
+        if req.META.get(PROFILE_HEADER) and req.user.is_staff:
+            return True
+
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return False
+
+        url_names = settings.PROFILING_URL_NAMES
+        return not url_names or req.resolver_match.view_name in url_names
+
+    def process_view(self, req, view_func, view_args, view_kwargs):
+        # async view (例如 SSE) 不在這個 thread 執行，抓不到東西
+        if iscoroutinefunction(view_func) or not self.should_profile(req):
+            return None
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        view_name = req.resolver_match.view_name.replace(":", "-")
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{view_name}-{os.getpid()}-{threading.get_ident()}"
+
+        if settings.PROFILING_MODE == "cprofile":
+            owner = _acquire_cprofile()
+            if owner is None:
+                return None
+
+            profiler = cProfile.Profile()
+            output = self.output_dir / f"{name}.prof"
+            stop = profiler.disable
+
+            def start():
+                try:
+                    profiler.enable()
+                except ValueError:
+                    # 其他分析工具 (例如 coverage、debugger) 正在使用，這段就不記錄
+                    pass
+
+            def finish():
+                try:
+                    profiler.dump_stats(output)
+                finally:
+                    _release_cprofile(owner)
+        else:
+            sampler = Sampler(threading.get_ident(), settings.PROFILING_INTERVAL)
+            output = self.output_dir / f"{name}.html"
+            # sampler 一直在背景抓，不需要暫停
+            start = stop = lambda: None
+            sampler.start()
+
+            def finish():
+                sampler.stop()
+                write_collapsed(sampler.stacks, self.output_dir / f"{name}.collapsed")
+                write_flamegraph(sampler.stacks, output, f"{req.method} {req.get_full_path()}")
+
+        start()
+        try:
+            response = view_func(req, *view_args, **view_kwargs)
+        except Exception:
+            stop()
+            finish()
+            raise
+        stop()
+
+        response["X-Profile-Output"] = output.name
+
+        # 串流的頁面 (my_project/streaming.py) 在 view 回傳後才查資料庫、渲染列表
+        # 要等內容全部送完才結束分析
+        if response.streaming:
+            response.streaming_content = self.trace(response, start, stop, finish)
+        else:
+            finish()
+        return response
+
+    def trace(self, response, start, stop, finish):
+        content = response.streaming_content
+
+        if response.is_async:
+            # ASGI 下每一段是在 sync_to_async 的 thread 產生的
+            # sample 模式抓的是同一個 thread 所以量得到，cprofile 模式只量得到 view 本身
+            async def traced():
+                try:
+                    async for chunk in content:
+                        yield chunk
+                finally:
+                    finish()
+
+            return traced()
+
+        def traced():
+            try:
+                iterator = iter(content)
+                while True:
+                    start()
+                    try:
+                        chunk = next(iterator, None)
+                    finally:
+                        stop()
+                    if chunk is None:
+                        return
+                    yield chunk
+            finally:
+                finish()
+
+        return traced()
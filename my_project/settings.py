@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'users',
     'pages',
     'interviews',
+    'throttling',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -57,6 +58,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'throttling.middleware.RateLimitMiddleware',
+    'my_project.profiling.ProfilingMiddleware', # 要放最後，才會只量到 view 本身
 ]
 
 ROOT_URLCONF = 'my_project.urls'
@@ -78,6 +81,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'my_project.wsgi.application'
 
+# 啟動時先載入所有 template 與 URL，開發時有 autoreload 所以預設關閉
+# 正式環境請用 my_project.settings_production
+WARMUP_ON_STARTUP = env.bool('WARMUP_ON_STARTUP', default=False)
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -88,10 +95,73 @@ DATABASES = {
     'default': env.db(),  # 自動解析 DATABASE_URL
 }
 
+# 快取，預設用 local memory，也可以設定成 file 例如 CACHE_URL=filecache:///var/tmp/django_cache
+# local memory 是每個 process 各自一份：整頁快取的 invalidate() 只清得到處理寫入的那個 worker，
+# 其他 worker 會繼續回傳舊頁面最多 PAGE_CACHE_TIMEOUT 秒。多個 worker 時要用共用的快取 (file、redis、memcached)
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# 匿名訪客整頁快取的秒數
+PAGE_CACHE_TIMEOUT = env.int('PAGE_CACHE_TIMEOUT', default=600)
+
+# 單一 request 的效能分析，沒開的話 middleware 不會載入
+PROFILING_ENABLED = env.bool('PROFILING_ENABLED', default=False)
+# sample: 輸出 collapsed stack 與 HTML flame graph；cprofile: 輸出 .prof
+PROFILING_MODE = env('PROFILING_MODE', default='sample')
+# 抽樣比例 0 ~ 1，0 代表只分析 staff 帶 X-Profile header 的 request
+PROFILING_SAMPLE_RATE = env.float('PROFILING_SAMPLE_RATE', default=0)
+# 只抽樣這些 url name，例如 interviews:show,interviews:favorite
+PROFILING_URL_NAMES = env.list('PROFILING_URL_NAMES', default=[])
+# sample 模式抓 call stack 的間隔秒數
+PROFILING_INTERVAL = env.float('PROFILING_INTERVAL', default=0.001)
+PROFILING_DIR = env('PROFILING_DIR', default=os.path.join(BASE_DIR, 'profiles'))
+
+# 寫入 (POST) 限流，依 url name 設定 user / ip 各自的速率，格式是 "次數/s|m|h|d"
+RATELIMIT_ENABLED = env.bool('RATELIMIT_ENABLED', default=True)
+# cache: 用上面的 CACHES (local memory 時每個 process 各算各的)；db: 多個 worker 共用資料庫計數
+RATELIMIT_BACKEND = env('RATELIMIT_BACKEND', default='cache')
+# 在 proxy 後面時讀取來源 ip 的 header，例如 HTTP_X_FORWARDED_FOR
+RATELIMIT_IP_HEADER = env('RATELIMIT_IP_HEADER', default=None)
+# 前面有幾層自己的 proxy，來源 ip 取 header 右邊數來第幾個
+RATELIMIT_TRUSTED_PROXIES = env.int('RATELIMIT_TRUSTED_PROXIES', default=1)
+# 允許、限流次數每隔幾秒寫進資料庫一次
+RATELIMIT_STATS_FLUSH_INTERVAL = env.int('RATELIMIT_STATS_FLUSH_INTERVAL', default=60)
+RATELIMITS = {
+    'interviews:index': {'user': '10/h', 'ip': '30/h'},
+    'interviews:comment': {'user': '10/m', 'ip': '30/m'},
+    'interviews:favorite': {'user': '20/m', 'ip': '60/m'},
+    'users:create_session': {'ip': '10/m'},
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
+# 密碼 hasher，第一個是新密碼使用的，其他的用來驗證舊密碼
+# 換了 hasher 之後，使用者下次登入時會自動升級成新的 hash
+# argon2 需要 argon2-cffi，bcrypt 需要 bcrypt
+# 保留 Django 預設的所有 hasher，舊的 hash 才能驗證並升級
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'users.hashers.PBKDF2PasswordHasher',
+    'pbkdf2_sha1': 'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'bcrypt': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+}
+PASSWORD_HASHER = env('PASSWORD_HASHER', default='pbkdf2')
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHERS[PASSWORD_HASHER],
+    *(hasher for name, hasher in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER),
+]
+# 不設定的話用 Django 的預設次數
+PBKDF2_ITERATIONS = env.int('PBKDF2_ITERATIONS', default=None)
+# 非同步登入時密碼驗證在 thread pool 執行，需要用 ASGI server 才不會佔住 request 的 thread
+AUTHENTICATION_BACKENDS = ['users.auth.PooledModelBackend']
+
+# 同時計算密碼 hash 的 thread 數，預設等於 CPU 核心數
+PASSWORD_HASH_WORKERS = env.int('PASSWORD_HASH_WORKERS', default=os.cpu_count() or 1)
+
 AUTH_PASSWORD_VALIDATORS = [
     # {
     #     'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -133,4 +203,21 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # APPEND_SLASH=False
 
-LOGIN_URL="users:sign_in"
\ No newline at end of file
+LOGIN_URL="users:sign_in"
+
+# 即時推播 (SSE) 的事件來源
+# local: 單一 process 內分送；postgres: 用 LISTEN/NOTIFY 讓多個 worker 共用
+INTERVIEW_EVENTS_BACKEND = env("INTERVIEW_EVENTS_BACKEND", default="local")
+
+# 列表頁串流輸出時，每次從資料庫拿、渲染幾筆
+STREAM_CHUNK_SIZE = 100
+
+# 每篇面試保留幾個相似面試
+SIMILAR_INTERVIEWS_K = 5
+
+# 封存超過幾天的面試 (python manage.py archive_interviews)
+ARCHIVE_AFTER_DAYS = env.int('ARCHIVE_AFTER_DAYS', default=365 * 3)
+# 用哪個欄位判斷面試的時間
+ARCHIVE_DATE_FIELD = 'interview_date'
+# 每批搬幾篇面試，一批一個 transaction
+ARCHIVE_BATCH_SIZE = 500
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+Production settings for my_project project.
+
+Use with DJANGO_SETTINGS_MODULE=my_project.settings_production.
+"""
+
+from copy import deepcopy
+
+from .settings import *  # noqa: F401,F403
+from .settings import TEMPLATES, env
+
+DEBUG = False
+
+ALLOWED_HOSTS = env.list('ALLOWED_HOSTS', default=['localhost'])
+
+SECRET_KEY = env('SECRET_KEY')
+
+# 明確使用 cached template loader，每個 template 只 parse 一次
+TEMPLATES = deepcopy(TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# 多個 worker 共用快取，整頁快取的 invalidate() 和限流的 bucket 才會在所有 worker 生效
+# 多台機器時改成 redis 或 memcached
+CACHES = {
+    'default': env.cache('CACHE_URL', default='filecache:///var/tmp/django_cache'),
+}
+
+# worker 啟動時先載入所有 template 與 URL (見 my_project/warmup.py)
+WARMUP_ON_STARTUP = True
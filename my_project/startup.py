@@ -0,0 +1,88 @@
+"""
+Measure how long a fresh worker takes to start and serve its first requests.
+
+Run in a new process so nothing is imported yet, e.g.::
+
+    python -m my_project.startup / /interviews/ --warmup
+
+Prints the timings as JSON; ``manage.py startup_report`` runs it and formats
+the result.
+"""
+
+import argparse
+import json
+import time
+
+
+def _ms(start):
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def _get(client, path):
+    from django.conf import settings
+
+    # 帶一個 session cookie，讓匿名整頁快取 (my_project/cache.py) 不會介入
+    # 第二次 request 量到的才是真正重新渲染的時間
+    # session 是空的，回應會把 cookie 刪掉，所以每次都要重新設定
+    client.cookies[settings.SESSION_COOKIE_NAME] = "startup-report"
+
+    start = time.perf_counter()
+    response = client.get(path)
+    # 串流的頁面要讀完才算完整的回應時間
+    if response.streaming:
+        b"".join(response.streaming_content)
+    return _ms(start), response.status_code, response.get("X-Page-Cache", "-")
+
+
+def measure(paths, warmup=False):
+    timings = {}
+
+    start = time.perf_counter()
+    import django
+    from django.conf import settings
+    settings.INSTALLED_APPS  # 讀一次設定才會真的 import settings module
+    timings["import"] = _ms(start)
+
+    start = time.perf_counter()
+    django.setup()
+    timings["app_registry"] = _ms(start)
+
+    start = time.perf_counter()
+    from django.core.wsgi import get_wsgi_application
+    get_wsgi_application()
+    timings["application"] = _ms(start)
+
+    if warmup:
+        from my_project.warmup import warm_templates, warm_urls
+
+        start = time.perf_counter()
+        warm_templates()
+        warm_urls()
+        timings["warmup"] = _ms(start)
+
+    from django.test import Client
+
+    hosts = [host.lstrip(".") for host in settings.ALLOWED_HOSTS if host != "*"]
+    client = Client(HTTP_HOST=hosts[0] if hosts else "localhost")
+
+    timings["requests"] = {}
+    for path in paths:
+        first, status, first_cache = _get(client, path)
+        second, _, second_cache = _get(client, path)
+        timings["requests"][path] = {
+            "status": status,
+            "first": first,
+            "second": second,
+            "cache": f"{first_cache}/{second_cache}",
+        }
+
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="*", default=["/"])
+    parser.add_argument("--warmup", action="store_true")
+    args = parser.parse_args()
+
+    print(json.dumps(measure(args.paths, args.warmup)))
@@ -0,0 +1,48 @@
+from itertools import batched
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+
+# 列表頁的串流輸出
+# 先送出 layout 的 head、navbar，列表內容再用 iterator() 分批從資料庫拿、分批渲染
+# 不用把整頁 HTML 和所有資料都放在記憶體裡
+
+PLACEHOLDER = "<!-- stream -->"
+
+
+def _async(iterator):
+    # ASGI 下 sync iterator 會被整個讀進記憶體，改成一次拿一段
+    # thread_sensitive 讓每一段都在同一個 thread 執行，資料庫 cursor 才能接著用
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+
+    async def stream():
+        while (chunk := await next_chunk(iterator, None)) is not None:
+            yield chunk
+
+    return stream()
+
+
+def render_stream(req, template_name, context, rows_template, rows, name, chunk_size=None):
+    # template_name 要在列表的位置放 {{ stream }}
+    # rows_template 會拿到名稱為 name 的一批資料，負責渲染這一批
+    chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+
+    page = render_to_string(template_name, {**context, "stream": mark_safe(PLACEHOLDER)}, req)
+    head, tail = page.split(PLACEHOLDER, 1)
+    template = get_template(rows_template)
+
+    def stream():
+        yield head
+        for chunk in batched(rows.iterator(chunk_size=chunk_size), chunk_size):
+            yield template.render({name: chunk})
+        yield tail
+
+    content = stream()
+    if isinstance(req, ASGIRequest):
+        content = _async(content)
+
+    return StreamingHttpResponse(content)
@@ -0,0 +1,62 @@
+import logging
+import os
+import time
+from pathlib import Path
+
+from django.template import engines
+from django.template.loader import get_template
+from django.template.utils import get_app_template_dirs
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+# 啟動時先把 template 和 URL 都載入一次
+# 搭配 cached template loader，worker 接到第一個 request 時就不用再 parse
+
+
+def template_names():
+    # 有設定 loaders 時 APP_DIRS 會是 False，但 app_directories loader 還是會找各 app 的 templates
+    dirs = list(get_app_template_dirs("templates"))
+    for engine in engines.all():
+        dirs += [Path(d) for d in engine.dirs]
+
+    names = set()
+    for directory in dirs:
+        for root, _, files in os.walk(directory):
+            for file in files:
+                if file.endswith(".html"):
+                    names.add(Path(root, file).relative_to(directory).as_posix())
+    return sorted(names)
+
+
+def warm_templates():
+    count = 0
+    for name in template_names():
+        try:
+            get_template(name)
+            count += 1
+        except Exception:
+            logger.exception("Failed to warm up template %s", name)
+    return count
+
+
+def warm_urls():
+    # 讀 reverse_dict 會 import 所有 urls 與 views，並建好反查表
+    # 有 namespace 的 (例如 interviews:show) 各自有一份，要一層一層往下讀
+    count = 0
+    resolvers = [get_resolver()]
+    while resolvers:
+        resolver = resolvers.pop()
+        count += sum(1 for key in resolver.reverse_dict if isinstance(key, str))
+        resolvers += [sub_resolver for _, sub_resolver in resolver.namespace_dict.values()]
+    return count
+
+
+def warm_up():
+    start = time.perf_counter()
+    templates = warm_templates()
+    urls = warm_urls()
+    logger.info(
+        "Warmed up %d templates and %d url names in %.1f ms",
+        templates, urls, (time.perf_counter() - start) * 1000,
+    )
@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+PHASES = [
+    ("import", "import Django 與 settings"),
+    ("app_registry", "django.setup() (app registry)"),
+    ("application", "建立 WSGI application (middleware)"),
+    ("warmup", "預先載入 template 與 URL"),
+]
+
+
+class Command(BaseCommand):
+    help = "用新的 process 測量 worker 啟動時間與第一個 request 的延遲，比較有無 warm-up 的差別"
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="*", default=["/", "/about", "/interviews/"])
+
+    def run(self, paths, warmup):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+        command = [sys.executable, "-m", "my_project.startup", *paths]
+        if warmup:
+            command.append("--warmup")
+
+        result = subprocess.run(
+            command, env=env, cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        )
+        # 只取最後一行，前面可能有 log
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        paths = options["paths"]
+
+        for warmup in (False, True):
+            timings = self.run(paths, warmup)
+            self.stdout.write(self.style.MIGRATE_HEADING("有 warm-up" if warmup else "沒有 warm-up"))
+
+            total = 0
+            for key, label in PHASES:
+                if key in timings:
+                    total += timings[key]
+                    self.stdout.write(f"  {label:<40} {timings[key]:>8.1f} ms")
+            self.stdout.write(f"  {'啟動合計':<40} {total:>8.1f} ms")
+
+            for path, request in timings["requests"].items():
+                self.stdout.write(
+                    f"  GET {path:<36} {request['first']:>8.1f} ms "
+                    f"(第二次 {request['second']:.1f} ms, {request['status']}, page cache {request['cache']})"
+                )
@@ -2,6 +2,7 @@ from django.shortcuts import render, redirect
 import braintree
 from django.views.decorators.http import require_POST
 from django.contrib import messages
+from my_project.cache import anonymous_cache_page
 
 import os 
 from dotenv import load_dotenv
@@ -9,12 +10,15 @@ load_dotenv()
 
 # Create your views here.
 
+@anonymous_cache_page()
 def index(req):
     return render(req, "pages/index.html")
 
+@anonymous_cache_page()
 def about(req):
     return render(req, "pages/about.html")
 
+@anonymous_cache_page()
 def contact(req):
     return render(req, "pages/contact.html")
 
@@ -1,8 +1,19 @@
+import htmx from 'htmx.org';
 import Alpine from 'alpinejs';
 import { Message } from './message';
 import { BraintreeForm } from "./braintree"
+import { Live } from "./live"
 
 Alpine.data('message', Message);
 Alpine.data("braintree_form", BraintreeForm)
+Alpine.data("live", Live)
+
+// 被限流 (429) 時 htmx 預設不會更新畫面，讓提示訊息放進 #htmx-messages
+document.addEventListener("htmx:beforeSwap", (e) => {
+  if (e.detail.xhr.status === 429) {
+    e.detail.shouldSwap = true
+    e.detail.isError = false
+  }
+})
 
 Alpine.start();
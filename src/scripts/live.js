@@ -0,0 +1,29 @@
+export const Live = () => ({
+  init() {
+    const { url } = this.$el.dataset
+    this.source = new EventSource(url)
+
+    this.source.addEventListener("comment", (e) => {
+      const template = document.createElement("template")
+      template.innerHTML = e.data.trim()
+      const item = template.content.firstElementChild
+
+      // 自己剛送出的留言可能已經在頁面上
+      if (item && !document.getElementById(item.id)) {
+        this.$refs.comments.prepend(item)
+      }
+    })
+
+    this.source.addEventListener("favorite", (e) => {
+      this.$refs.favorites.textContent = e.data
+    })
+
+    this.source.addEventListener("reload", () => {
+      window.location.reload()
+    })
+  },
+
+  destroy() {
+    this.source.close()
+  },
+})
@@ -3088,7 +3088,7 @@
     }
   });
 
-  // src/app.js
+  // src/scripts/app.js
   var import_htmx = __toESM(require_htmx_min());
 
   // node_modules/alpinejs/dist/module.esm.js
@@ -6373,7 +6373,47 @@ ${expression ? 'Expression: "' + expression + '"\n\n' : ""}`, el);
   var src_default = alpine_default;
   var module_default = src_default;
 
-  // src/app.js
-  window.Alpine = module_default;
+  // src/scripts/message.js
+  var Message = () => ({
+    show: true,
+    close() {
+      this.show = false;
+    }
+  });
+
+  // src/scripts/live.js
+  var Live = () => ({
+    init() {
+      const { url } = this.$el.dataset;
+      this.source = new EventSource(url);
+      this.source.addEventListener("comment", (e) => {
+        const template = document.createElement("template");
+        template.innerHTML = e.data.trim();
+        const item = template.content.firstElementChild;
+        if (item && !document.getElementById(item.id)) {
+          this.$refs.comments.prepend(item);
+        }
+      });
+      this.source.addEventListener("favorite", (e) => {
+        this.$refs.favorites.textContent = e.data;
+      });
+      this.source.addEventListener("reload", () => {
+        window.location.reload();
+      });
+    },
+    destroy() {
+      this.source.close();
+    }
+  });
+
+  // src/scripts/app.js
+  module_default.data("message", Message);
+  module_default.data("live", Live);
+  document.addEventListener("htmx:beforeSwap", (e) => {
+    if (e.detail.xhr.status === 429) {
+      e.detail.shouldSwap = true;
+      e.detail.isError = false;
+    }
+  });
   module_default.start();
 })();
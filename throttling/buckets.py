@@ -0,0 +1,72 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Bucket
+
+# Token bucket：容量 N 個 token，每秒補充 N / period 個，每次寫入消耗 1 個
+# 一次可以連點 N 下，但長期平均不會超過設定的速率
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    # "10/m" => (10, 10 / 60)
+    count, period = rate.split("/")
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period]
+
+
+def _refill(tokens, updated_at, capacity, refill, now):
+    return min(capacity, tokens + (now - updated_at) * refill)
+
+
+def _take(tokens, refill):
+    # 回傳 (剩下的 token, 要等幾秒)，等待秒數 0 代表允許
+    if tokens >= 1:
+        return tokens - 1, 0
+    return tokens, (1 - tokens) / refill
+
+
+class CacheBuckets:
+    # 用 Django cache 存 bucket，local memory 的話每個 process 各自計算
+    prefix = "throttling:bucket"
+
+    def consume(self, key, capacity, refill):
+        now = time.time()
+        key = f"{self.prefix}:{key}"
+        tokens, updated_at = cache.get(key, (capacity, now))
+
+        tokens, retry_after = _take(_refill(tokens, updated_at, capacity, refill, now), refill)
+
+        # 過了補滿所需的時間，bucket 就跟新的一樣，可以讓快取過期
+        cache.set(key, (tokens, now), capacity / refill)
+        return retry_after
+
+
+class DatabaseBuckets:
+    # 用資料庫的 row lock，多個 worker 之間也會準確計算
+    def consume(self, key, capacity, refill):
+        now = time.time()
+        with transaction.atomic():
+            bucket, _ = Bucket.objects.select_for_update().get_or_create(
+                key=key, defaults={"tokens": capacity, "updated_at": now}
+            )
+            bucket.tokens, retry_after = _take(
+                _refill(bucket.tokens, bucket.updated_at, capacity, refill, now), refill
+            )
+            bucket.updated_at = now
+            bucket.save(update_fields=["tokens", "updated_at"])
+        return retry_after
+
+
+BACKENDS = {
+    "cache": CacheBuckets,
+    "db": DatabaseBuckets,
+}
+
+
+def get_buckets():
+    return BACKENDS[settings.RATELIMIT_BACKEND]()
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+from throttling import metrics
+from throttling.models import Bucket
+
+
+class Command(BaseCommand):
+    help = "顯示每個 url 被允許、被限流的次數"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="顯示後把計數歸零")
+        parser.add_argument("--purge", action="store_true", help="刪除一天以上沒用到的資料庫 bucket")
+
+    def handle(self, *args, **options):
+        for view_name, counts in metrics.stats().items():
+            total = counts["allowed"] + counts["throttled"]
+            ratio = counts["throttled"] / total if total else 0
+            self.stdout.write(f"{view_name}: allowed={counts['allowed']} throttled={counts['throttled']} ({ratio:.1%})")
+
+        if options["reset"]:
+            metrics.reset()
+
+        if options["purge"]:
+            deleted, _ = Bucket.objects.filter(updated_at__lt=time.time() - 86400).delete()
+            self.stdout.write(self.style.SUCCESS(f"已刪除 {deleted} 個 bucket"))
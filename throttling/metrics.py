@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import F
+
+from .models import Stat
+
+# 每個 url name 被允許、被限流的次數
+# 用 python manage.py throttle_stats 查看
+#
+# 先記在 process 裡，每 RATELIMIT_STATS_FLUSH_INTERVAL 秒才寫一次資料庫
+# 被限流的 request 完全不碰資料庫，大量攻擊時寫入量也不會跟著變大
+
+OUTCOMES = ("allowed", "throttled")
+
+_pending = Counter()
+_lock = threading.Lock()
+_flushed_at = time.monotonic()
+
+
+def record(view_name, outcome):
+    with _lock:
+        _pending[(view_name, outcome)] += 1
+
+
+def _add(view_name, outcome, count):
+    counts = Stat.objects.filter(view_name=view_name, outcome=outcome)
+    if counts.update(count=F("count") + count):
+        return
+
+    _, created = Stat.objects.get_or_create(view_name=view_name, outcome=outcome, defaults={"count": count})
+    if not created:
+        # 剛好被其他 worker 先建立了
+        counts.update(count=F("count") + count)
+
+
+def flush(force=False):
+    # 只在允許的 request 呼叫，那些 request 本來就會寫資料庫
+    global _flushed_at
+
+    with _lock:
+        if not _pending or (not force and time.monotonic() - _flushed_at < settings.RATELIMIT_STATS_FLUSH_INTERVAL):
+            return
+        pending = dict(_pending)
+        _pending.clear()
+        _flushed_at = time.monotonic()
+
+    for (view_name, outcome), count in pending.items():
+        _add(view_name, outcome, count)
+
+
+def stats():
+    # 其他 worker 還沒寫進資料庫的部分看不到，最多慢 RATELIMIT_STATS_FLUSH_INTERVAL 秒
+    flush(force=True)
+    values = {
+        (stat.view_name, stat.outcome): stat.count
+        for stat in Stat.objects.filter(view_name__in=settings.RATELIMITS)
+    }
+    return {
+        view_name: {outcome: values.get((view_name, outcome), 0) for outcome in OUTCOMES}
+        for view_name in settings.RATELIMITS
+    }
+
+
+def reset():
+    with _lock:
+        _pending.clear()
+    Stat.objects.all().delete()
@@ -0,0 +1,92 @@
+import logging
+import math
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.shortcuts import render
+
+from . import metrics
+from .buckets import get_buckets, parse_rate
+
+logger = logging.getLogger(__name__)
+
+# 寫入類的 request (POST) 限流
+# 在 settings.RATELIMITS 依 url name 設定，每個 url 可以同時限制 user 和 ip
+
+
+def client_ip(req):
+    # 在 proxy 後面的話，設定 RATELIMIT_IP_HEADER 讀取真正的來源 ip
+    # 最左邊的值可以被 client 任意偽造，每一層 proxy 都會往右邊加上它看到的 ip，
+    # 所以要從右邊數第 RATELIMIT_TRUSTED_PROXIES 個
+    if settings.RATELIMIT_IP_HEADER:
+        forwarded = [ip.strip() for ip in req.META.get(settings.RATELIMIT_IP_HEADER, "").split(",") if ip.strip()]
+        if len(forwarded) >= settings.RATELIMIT_TRUSTED_PROXIES:
+            return forwarded[-settings.RATELIMIT_TRUSTED_PROXIES]
+    return req.META.get("REMOTE_ADDR")
+
+
+def identify(req, scope):
+    if scope == "user":
+        # 沒登入的話只能用 ip 限制
+        return req.user.pk if req.user.is_authenticated else None
+    if scope == "ip":
+        return client_ip(req)
+    raise ValueError(f"Unknown rate limit scope: {scope}")
+
+
+def throttled(req, retry_after):
+    seconds = math.ceil(retry_after)
+    context = {"retry_after": seconds}
+
+    if req.headers.get("HX-Request"):
+        # htmx 只換掉畫面上的提示區塊，不要把原本的按鈕蓋掉
+        response = render(req, "throttling/throttled.html", context, status=429)
+        response["HX-Retarget"] = "#htmx-messages"
+        response["HX-Reswap"] = "innerHTML"
+    else:
+        response = render(req, "throttling/throttled_page.html", context, status=429)
+
+    response["Retry-After"] = str(seconds)
+    return response
+
+
+class RateLimitMiddleware:
+    def __init__(self, get_response):
+        if not settings.RATELIMIT_ENABLED or not settings.RATELIMITS:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.buckets = get_buckets()
+        # {"interviews:favorite": {"user": (capacity, refill), "ip": (...)}}
+        self.limits = {
+            view_name: {scope: parse_rate(rate) for scope, rate in rates.items()}
+            for view_name, rates in settings.RATELIMITS.items()
+        }
+
+    def __call__(self, req):
+        return self.get_response(req)
+
+    def process_view(self, req, view_func, view_args, view_kwargs):
+        if req.method != "POST":
+            return None
+
+        view_name = req.resolver_match.view_name
+        limits = self.limits.get(view_name)
+        if limits is None:
+            return None
+
+        retry_after = 0
+        for scope, (capacity, refill) in limits.items():
+            ident = identify(req, scope)
+            if ident is not None:
+                key = f"{view_name}:{scope}:{ident}"
+                retry_after = max(retry_after, self.buckets.consume(key, capacity, refill))
+
+        if not retry_after:
+            metrics.record(view_name, "allowed")
+            metrics.flush()
+            return None
+
+        metrics.record(view_name, "throttled")
+        logger.warning("Throttled %s for user=%s ip=%s", view_name, req.user.pk, client_ip(req))
+        return throttled(req, retry_after)
@@ -0,0 +1,25 @@
+# Generated by Django 6.1.2 on 2026-10-19 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('throttling', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Stat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view_name', models.CharField(max_length=200)),
+                ('outcome', models.CharField(max_length=20)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('view_name', 'outcome'), name='unique_throttling_stat')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import models
+
+# 多個 worker 共用的 token bucket，RATELIMIT_BACKEND = "db" 時使用
+class Bucket(models.Model):
+    key = models.CharField(max_length=200, unique=True)
+    tokens = models.FloatField()
+    updated_at = models.FloatField() # time.time()，方便計算補充的 token
+
+# 每個 url name 被允許、被限流的次數
+# 放在資料庫，throttle_stats 在另一個 process 執行時也讀得到
+class Stat(models.Model):
+    view_name = models.CharField(max_length=200)
+    outcome = models.CharField(max_length=20)
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["view_name", "outcome"], name="unique_throttling_stat"),
+        ]
@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from interviews.models import Interview
+
+from . import metrics
+from .middleware import client_ip
+from .models import Stat
+
+
+@override_settings(
+    RATELIMIT_ENABLED=True,
+    RATELIMIT_BACKEND="cache",
+    RATELIMITS={"interviews:comment": {"user": "2/m"}},
+    RATELIMIT_STATS_FLUSH_INTERVAL=0,
+)
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.user = User.objects.create_user("user", password="password")
+        self.client.force_login(self.user)
+        self.interview = Interview.objects.create(
+            company_name="公司", position="工程師", review="心得", rating=5, user=self.user
+        )
+        self.url = f"/interviews/{self.interview.id}/comment"
+
+    def comment(self, **headers):
+        return self.client.post(self.url, {"content": "留言"}, headers=headers)
+
+    def test_over_the_limit_returns_429_with_retry_after(self):
+        self.assertEqual(self.comment().status_code, 302)
+        self.assertEqual(self.comment().status_code, 302)
+
+        response = self.comment()
+
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+        self.assertTemplateUsed(response, "throttling/throttled_page.html")
+        self.assertEqual(self.interview.comment_set.count(), 2)
+
+    def test_htmx_request_is_retargeted_to_messages(self):
+        self.comment()
+        self.comment()
+
+        response = self.comment(HX_Request="true")
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["HX-Retarget"], "#htmx-messages")
+        self.assertTemplateUsed(response, "throttling/throttled.html")
+
+    def test_throttled_requests_do_not_write_stats(self):
+        self.comment()
+        self.comment()
+        self.assertEqual(Stat.objects.get(view_name="interviews:comment", outcome="allowed").count, 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.comment()
+            self.comment()
+
+        self.assertFalse([query for query in queries if Stat._meta.db_table in query["sql"]])
+
+        self.assertEqual(metrics.stats()["interviews:comment"], {"allowed": 2, "throttled": 2})
+
+
+@override_settings(RATELIMIT_IP_HEADER="HTTP_X_FORWARDED_FOR")
+class ClientIpTests(TestCase):
+    def request(self, forwarded):
+        return RequestFactory().get("/", HTTP_X_FORWARDED_FOR=forwarded, REMOTE_ADDR="10.0.0.1")
+
+    def test_uses_rightmost_entry_behind_one_proxy(self):
+        self.assertEqual(client_ip(self.request("1.1.1.1, 2.2.2.2")), "2.2.2.2")
+
+    @override_settings(RATELIMIT_TRUSTED_PROXIES=2)
+    def test_counts_trusted_proxies_from_the_right(self):
+        self.assertEqual(client_ip(self.request("6.6.6.6, 1.1.1.1, 2.2.2.2")), "1.1.1.1")
+
+    def test_ignores_spoofed_leftmost_entry(self):
+        # client 自己帶了 X-Forwarded-For，proxy 再把真正的 ip 加在右邊
+        self.assertEqual(client_ip(self.request("6.6.6.6, 3.3.3.3")), "3.3.3.3")
+
+    @override_settings(RATELIMIT_TRUSTED_PROXIES=3)
+    def test_falls_back_to_remote_addr_when_header_is_too_short(self):
+        self.assertEqual(client_ip(self.request("1.1.1.1, 2.2.2.2")), "10.0.0.1")
+
+    @override_settings(RATELIMIT_IP_HEADER=None)
+    def test_uses_remote_addr_without_header(self):
+        self.assertEqual(client_ip(self.request("1.1.1.1")), "10.0.0.1")
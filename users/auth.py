@@ -0,0 +1,60 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password, verify_password
+
+# 非同步登入
+# 密碼 hash 很吃 CPU，放到固定大小的 thread pool 執行，不會卡住其他 request
+# hashlib / argon2 計算時會釋放 GIL，多個 thread 可以真的同時跑在不同核心上
+#
+# 只有用 ASGI server 執行時 (見 my_project/asgi.py) 才有這個效果
+# WSGI 下每個 request 本來就佔用一個 thread，async view 還是會等 hash 算完
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash",
+        )
+    return _executor
+
+
+async def run_in_pool(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), func, *args)
+
+
+class PooledModelBackend(ModelBackend):
+    # 跟 ModelBackend 一樣，只是 aauthenticate() 的密碼驗證改在 thread pool 執行
+    # 在 settings.AUTHENTICATION_BACKENDS 設定，django.contrib.auth.aauthenticate() 會呼叫它
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        User = get_user_model()
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        try:
+            user = await User._default_manager.aget_by_natural_key(username)
+        except User.DoesNotExist:
+            # 還是算一次 hash，避免從回應時間猜出帳號存不存在
+            await run_in_pool(make_password, password)
+            return None
+
+        is_correct, must_update = await run_in_pool(verify_password, password, user.password)
+        if not is_correct or not self.user_can_authenticate(user):
+            return None
+
+        if must_update:
+            # 換了 hasher 或調整過 iterations，登入成功時順便升級成新的 hash
+            user.password = await run_in_pool(make_password, password)
+            await user.asave(update_fields=["password"])
+
+        return user
@@ -0,0 +1,7 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+# 可以用 PBKDF2_ITERATIONS 調整次數，使用者下次登入時會自動換成新的 hash
+# 次數越低登入越快，但密碼外洩時也越容易被暴力破解，沒有特別需要就用 Django 的預設值
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    iterations = settings.PBKDF2_ITERATIONS or hashers.PBKDF2PasswordHasher.iterations
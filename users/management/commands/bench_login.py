@@ -0,0 +1,53 @@
+import asyncio
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.core.management.base import BaseCommand
+from django.contrib.auth import aauthenticate
+from users.auth import run_in_pool
+
+
+class Command(BaseCommand):
+    help = "測量密碼驗證的速度，回報每個核心每秒可以處理幾次登入"
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", type=int, default=100, help="驗證次數")
+        parser.add_argument("--username", help="用資料庫裡的帳號跑完整的 aauthenticate 流程")
+        parser.add_argument("--password", default="benchmark-password")
+
+    def handle(self, *args, **options):
+        n = options["n"]
+        workers = settings.PASSWORD_HASH_WORKERS
+        cores = min(workers, os.cpu_count() or 1)
+
+        if options["username"]:
+            check = lambda: aauthenticate(None, username=options["username"], password=options["password"])
+        else:
+            encoded = make_password(options["password"])
+            check = lambda: run_in_pool(get_hasher().verify, options["password"], encoded)
+
+        hasher = get_hasher()
+        self.stdout.write(f"hasher: {hasher.algorithm} {getattr(hasher, 'iterations', '')}".rstrip())
+        self.stdout.write(f"thread pool: {workers} workers, {cores} cores")
+
+        # 一次一個，等於單一核心的速度
+        serial = asyncio.run(self.serial(check, n))
+        self.stdout.write(f"serial: {n / serial:.1f} logins/s ({serial / n * 1000:.1f} ms/login)")
+
+        # 同時送出，看 thread pool 能把多少核心用滿
+        concurrent = asyncio.run(self.concurrent(check, n))
+        self.stdout.write(f"concurrent: {n / concurrent:.1f} logins/s")
+        self.stdout.write(self.style.SUCCESS(f"{n / concurrent / cores:.1f} logins/s per core"))
+
+    async def serial(self, check, n):
+        start = time.perf_counter()
+        for _ in range(n):
+            await check()
+        return time.perf_counter() - start
+
+    async def concurrent(self, check, n):
+        start = time.perf_counter()
+        await asyncio.gather(*(check() for _ in range(n)))
+        return time.perf_counter() - start
@@ -1,6 +1,6 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.forms import UserCreationForm
-from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth import aauthenticate, alogin, logout
 # django decorator
 from django.views.decorators.http import require_POST
 from django.urls import reverse
@@ -34,17 +34,20 @@ def sign_in(req):
     
     return render(req, "users/sign_in.html", {"next": next})
 
+# 非同步登入，密碼驗證在 thread pool 執行 (users.auth.PooledModelBackend)
+# 用 ASGI server 執行時，登入量大也不會卡住其他頁面
 @require_POST
-def create_session(req):
+async def create_session(req):
     username = req.POST['username']
     password = req.POST['password']
 
-    user = authenticate(
+    user = await aauthenticate(
+        req,
         username=username,
         password=password)
     
     if user is not None:
-        login(req, user) # cookie 給瀏覽器，session 存 server
+        await alogin(req, user) # cookie 給瀏覽器，session 存 server
         # @login_required 返回 LOGIN_URL 後會在網址後面加 QueryString ?next=<原本的 url>
         # 處理 next
         next = req.POST.get("next", reverse("pages:index"))